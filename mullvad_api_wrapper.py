@@ -1,5 +1,34 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, TypeVar
+
+import httpx
+import orjson
 import requests
-from pydantic import BaseModel, Field
+from pydantic.config import ConfigDict
+from pydantic.fields import Field
+from pydantic.main import BaseModel
+from requests.adapters import HTTPAdapter, Retry
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Relay leaf models are built thousands of times per relay list and shared
+# through the response caches, so make them immutable.
+_LEAF_MODEL_CONFIG = ConfigDict(extra="ignore", frozen=True)
 
 
 class Account(BaseModel):
@@ -18,6 +47,8 @@ class GetAccountInformationResponse(Account):
 
 
 class OpenVPNRelay(BaseModel):
+    model_config = _LEAF_MODEL_CONFIG
+
     hostname: str | None = None
     location: str | None = None
     active: bool | None = None
@@ -34,6 +65,8 @@ class BridgeRelay(OpenVPNRelay):
 
 
 class WireGuardRelay(BaseModel):
+    model_config = _LEAF_MODEL_CONFIG
+
     hostname: str | None = None
     location: str | None = None
     active: bool | None = None
@@ -47,19 +80,11 @@ class WireGuardRelay(BaseModel):
     ipv6_addr_in: str | None = None
 
 
-class WireGuardShadowsocksPortRanges(BaseModel):
-    shadowsocks_port_ranges: list[int]
-
-
 class Location(BaseModel):
     city: str | None = None
     country: str | None = None
-    latitude: str | None = None
-    longitude: str | None = None
-
-
-class Locations(BaseModel):
-    locations: dict[str, Location] | None = None
+    latitude: float | None = None
+    longitude: float | None = None
 
 
 class OpenVPNPort(BaseModel):
@@ -74,27 +99,34 @@ class BridgeShadowsocks(BaseModel):
     password: str
 
 
-class RelayList(BaseModel):
-    locations: Locations
-    openvpn: dict[str, list[OpenVPNRelay] | list[OpenVPNPort]]
-    wireguard: dict[
-        str,
-        list[WireGuardRelay]
-        | list[list[int]]
-        | list[WireGuardShadowsocksPortRanges]
-        | str,
-    ]
-    bridge: dict[str, list[BridgeRelay] | str, list[BridgeShadowsocks]]
+class OpenVPN(BaseModel):
+    ports: list[OpenVPNPort] | None = None
+    relays: list[OpenVPNRelay] | None = None
 
 
 class Wireguard(BaseModel):
-    port_ranges: list[list[int, int]] | None = None
+    port_ranges: list[tuple[int, int]] | None = None
     ipv4_gateway: str | None = None
     ipv6_gateway: str | None = None
+    shadowsocks_port_ranges: list[tuple[int, int]] | None = None
     relays: list[WireGuardRelay] | None = None
 
 
+class Bridge(BaseModel):
+    shadowsocks: list[BridgeShadowsocks] | None = None
+    relays: list[BridgeRelay] | None = None
+
+
+class RelayList(BaseModel):
+    locations: dict[str, Location]
+    openvpn: OpenVPN
+    wireguard: Wireguard
+    bridge: Bridge
+
+
 class Hostname(BaseModel):
+    model_config = _LEAF_MODEL_CONFIG
+
     hostname: str | None = None
     ipv4_addr_in: str | None = None
     ipv6_addr_in: str | None = None
@@ -104,6 +136,8 @@ class Hostname(BaseModel):
 
 
 class City(BaseModel):
+    model_config = _LEAF_MODEL_CONFIG
+
     name: str | None = None
     code: str | None = None
     latitude: float | None = None
@@ -112,6 +146,8 @@ class City(BaseModel):
 
 
 class Country(BaseModel):
+    model_config = _LEAF_MODEL_CONFIG
+
     name: str | None = None
     code: str | None = None
     cities: list[City] | None
@@ -135,7 +171,7 @@ class Voucher(BaseModel):
 
 
 class WireGuardServerListResponseV2(BaseModel):
-    locations: Locations | None = None
+    locations: dict[str, Location] | None = None
     wireguard: Wireguard | None = None
 
 
@@ -175,54 +211,431 @@ class CreateAnAppleInAppPaymentResponse(BaseModel):
     receipt_string: str
 
 
-class MullvadAPIEngine:
+@dataclass
+class RelayTable:
     """
-    API calls to api.mullvad.net and am.i.mullvad.net
-    https://api.mullvad.net/app/documentation
-    https://api.mullvad.net/public/documentation
+    Struct-of-arrays view of one relay list section: one list or numpy
+    array per relay field instead of one model per relay. Missing flags
+    read as False and missing weights as 0.
+    """
+
+    hostname: list[str]
+    location: list[str]
+    active: "np.ndarray"
+    owned: "np.ndarray"
+    provider: list[str]
+    stboot: "np.ndarray"
+    ipv4_addr_in: list[str]
+    include_in_country: "np.ndarray"
+    weight: "np.ndarray"
+    public_key: list[str | None]
+    ipv6_addr_in: list[str | None]
+
+    @classmethod
+    def from_relays(cls, relays: list[dict]) -> "RelayTable":
+        def column(key: str) -> list:
+            return [relay.get(key) for relay in relays]
+
+        def numbers(key: str, dtype) -> "np.ndarray":
+            return np.fromiter(
+                (relay.get(key) or 0 for relay in relays),
+                dtype=dtype,
+                count=len(relays),
+            )
+
+        def flags(key: str) -> "np.ndarray":
+            return np.fromiter(
+                (bool(relay.get(key)) for relay in relays),
+                dtype=bool,
+                count=len(relays),
+            )
+
+        return cls(
+            hostname=column("hostname"),
+            location=column("location"),
+            active=flags("active"),
+            owned=flags("owned"),
+            provider=column("provider"),
+            stboot=flags("stboot"),
+            ipv4_addr_in=column("ipv4_addr_in"),
+            include_in_country=flags("include_in_country"),
+            weight=numbers("weight", np.int32),
+            public_key=column("public_key"),
+            ipv6_addr_in=column("ipv6_addr_in"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.hostname)
+
+    def __getitem__(self, index: int) -> "RelayView":
+        if not isinstance(index, (int, np.integer)):
+            raise TypeError(
+                f"RelayTable indices must be integers, not {type(index).__name__}"
+            )
+        index = int(index)
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return RelayView(self, index % len(self))
+
+    def weighted_choice(
+        self, rng: "np.random.Generator | None" = None, active_only: bool = True
+    ) -> int:
+        """
+        Pick a relay index at random, weighted by relay weight
+        :param rng: numpy.random.Generator to draw from, a fresh one by default
+        :param active_only: bool Only pick relays marked active
+        :return: int index into the columns
+        """
+        weight = np.where(self.active, self.weight, 0) if active_only else self.weight
+        total = weight.sum()
+        if total <= 0:
+            raise ValueError("no relay with a positive weight to choose from")
+        rng = np.random.default_rng() if rng is None else rng
+        return int(rng.choice(len(weight), p=weight / total))
+
+
+class RelayView:
+    """
+    One relay of a RelayTable, reading its fields from the columns on access
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: RelayTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name: str):
+        if name not in RelayTable.__dataclass_fields__:
+            raise AttributeError(name)
+        value = getattr(self._table, name)[self._index]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __repr__(self) -> str:
+        return f"RelayView(hostname={self.hostname!r})"
+
+
+def _construct_relays(model: type[BaseModel], relays: list[dict]) -> list:
+    return [model.model_construct(**relay) for relay in relays]
+
+
+def _construct_locations(locations: dict[str, dict]) -> dict[str, Location]:
+    return {
+        code: Location.model_construct(**location)
+        for code, location in locations.items()
+    }
+
+
+def _construct_wireguard(wireguard: dict) -> Wireguard:
+    port_ranges = {
+        key: [tuple(port_range) for port_range in wireguard[key]]
+        for key in ("port_ranges", "shadowsocks_port_ranges")
+        if wireguard.get(key) is not None
+    }
+    return Wireguard.model_construct(
+        **{
+            **wireguard,
+            **port_ranges,
+            "relays": _construct_relays(WireGuardRelay, wireguard["relays"]),
+        }
+    )
+
+
+def _construct_countries(model: type[Countries], data: dict) -> Countries:
+    return model.model_construct(
+        countries=[
+            Country.model_construct(
+                cities=[
+                    City.model_construct(
+                        relays=_construct_relays(Hostname, city["relays"]),
+                        **{k: v for k, v in city.items() if k != "relays"},
+                    )
+                    for city in country["cities"]
+                ],
+                **{k: v for k, v in country.items() if k != "cities"},
+            )
+            for country in data["countries"]
+        ]
+    )
+
+
+def _construct_relay_list(data: dict) -> RelayList:
+    openvpn = data["openvpn"]
+    wireguard = data["wireguard"]
+    bridge = data["bridge"]
+    return RelayList.model_construct(
+        locations=_construct_locations(data["locations"]),
+        openvpn=OpenVPN.model_construct(
+            ports=_construct_relays(OpenVPNPort, openvpn["ports"]),
+            relays=_construct_relays(OpenVPNRelay, openvpn["relays"]),
+        ),
+        wireguard=_construct_wireguard(wireguard),
+        bridge=Bridge.model_construct(
+            shadowsocks=_construct_relays(BridgeShadowsocks, bridge["shadowsocks"]),
+            relays=_construct_relays(BridgeRelay, bridge["relays"]),
+        ),
+    )
+
+
+def _construct_wireguard_server_list_v2(data: dict) -> WireGuardServerListResponseV2:
+    return WireGuardServerListResponseV2.model_construct(
+        locations=_construct_locations(data["locations"]),
+        wireguard=_construct_wireguard(data["wireguard"]),
+    )
+
+
+class _MullvadAPIURLs:
+    """
+    Base and endpoint URLs shared by the sync and async engines
     """
 
     APP_API_URL = "https://api.mullvad.net/app"
     PUBLIC_API_URL = "https://api.mullvad.net/public"
     AM_I_URL = "https://am.i.mullvad.net"
 
+    _RELAYS_URL = APP_API_URL + "/v1/relays"
+    _API_ADDRS_URL = APP_API_URL + "/v1/api-addrs"
+    _SUBMIT_VOUCHER_URL = APP_API_URL + "/v1/submit-voucher"
+    _PROBLEM_REPORT_URL = APP_API_URL + "/v1/problem-report"
+    _WWW_AUTH_TOKEN_URL = APP_API_URL + "/v1/www-auth-token"
+    _RELEASES_URL = APP_API_URL + "/v1/releases"
+    _CREATE_APPLE_PAYMENT_URL = APP_API_URL + "/v1/create-apple-payment"
+
+    _OPENVPN_RELAYS_URL = PUBLIC_API_URL + "/relays/v1"
+    _WIREGUARD_RELAYS_V1_URL = PUBLIC_API_URL + "/relays/wireguard/v1"
+    _WIREGUARD_RELAYS_V2_URL = PUBLIC_API_URL + "/relays/wireguard/v2"
+    _ACCOUNTS_URL = PUBLIC_API_URL + "/accounts/v1"
+    _SUBMIT_VOUCHER_CODE_URL = PUBLIC_API_URL + "/vouchers/submit/v1"
+
+    _AM_I_CONNECTED_URL = AM_I_URL + "/connected"
+    _AM_I_IP_URL = AM_I_URL + "/ip"
+    _AM_I_CITY_URL = AM_I_URL + "/city"
+    _AM_I_COUNTRY_URL = AM_I_URL + "/country"
+    _AM_I_JSON_URL = AM_I_URL + "/json"
+
+
+class _SharedSession:
+    """
+    One requests.Session shared by every MullvadAPIEngine so they share a
+    connection pool; closed when the last engine using it is closed
+    """
+
     def __init__(self):
-        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._session: requests.Session | None = None
+        self._refcount = 0
+
+    @staticmethod
+    def _create() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.25,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        session.mount("https://api.mullvad.net", adapter)
+        session.mount("https://am.i.mullvad.net", adapter)
+        return session
+
+    def acquire(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = self._create()
+            self._refcount += 1
+            return self._session
+
+    def release(self):
+        with self._lock:
+            self._refcount -= 1
+            if self._refcount == 0:
+                self._session.close()
+                self._session = None
+
+
+def _close_engine(shared_session: _SharedSession, pool: ThreadPoolExecutor):
+    pool.shutdown(wait=False, cancel_futures=True)
+    shared_session.release()
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_RELAY_MODELS: dict[str, type[BaseModel]] = {
+    "openvpn": OpenVPNRelay,
+    "wireguard": WireGuardRelay,
+    "bridge": BridgeRelay,
+}
+
+
+class MullvadAPIEngine(_MullvadAPIURLs):
+    """
+    API calls to api.mullvad.net and am.i.mullvad.net
+    https://api.mullvad.net/app/documentation
+    https://api.mullvad.net/public/documentation
+    All engines in the process share one private requests.Session.
+    """
+
+    RELEASE_CACHE_TTL = 3600  # seconds
+    RELEASE_CACHE_MAXSIZE = 32
+
+    _shared_session = _SharedSession()
+
+    def __init__(self):
+        self._session = self._shared_session.acquire()
+        self._pool = ThreadPoolExecutor(max_workers=6)
+        self._finalizer = weakref.finalize(
+            self, _close_engine, self._shared_session, self._pool
+        )
+        self._conditional_cache: dict[str, tuple[dict[str, str], BaseModel]] = {}
+        self._release_cache: OrderedDict[
+            tuple[str, str], tuple[float, InformationAboutAppReleaseResponse]
+        ] = OrderedDict()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.close()
+        self.close()
 
-    def __del__(self):
-        self.session.close()
+    def close(self):
+        """
+        Release the shared session, closing it if this was the last engine
+        using it, and shut down the prefetch pool. Safe to call more than
+        once, and also runs when the engine is garbage collected.
+        """
+        self._finalizer()
 
     def _get(self, url: str, **kwargs) -> requests.Response:
-        response = self.session.get(url=url, **kwargs)
+        response = self._session.get(url=url, **kwargs)
         response.raise_for_status()
         return response
 
     def _post(self, url: str, **kwargs) -> requests.Response:
-        response = self.session.post(url=url, **kwargs)
+        response = self._session.post(url=url, **kwargs)
         response.raise_for_status()
         return response
 
+    def _get_json(self, url: str, **kwargs):
+        with self._get(url=url, **kwargs) as response:
+            return orjson.loads(response.content)
+
+    def _get_text(self, url: str, **kwargs) -> str:
+        with self._get(url=url, **kwargs) as response:
+            return response.text.strip()
+
+    def _get_cached(self, url: str, model: type[ModelT]) -> ModelT:
+        """
+        Conditional GET: revalidate the cached model with If-None-Match /
+        If-Modified-Since and only download and parse again on a change.
+        A 304 returns the same instance as the previous call, so callers
+        must not modify it (copy with model_copy(deep=True) first).
+        """
+        validators, cached = self._conditional_cache.get(url, ({}, None))
+        response = self._get(url=url, headers=validators)
+        if response.status_code == 304 and cached is not None:
+            return cached
+        parsed = model.model_validate_json(response.content)
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if validators:
+            self._conditional_cache[url] = (validators, parsed)
+        return parsed
+
+    @staticmethod
+    async def _fan_out() -> dict[str, str | dict]:
+        async with AsyncMullvadAPIEngine() as amv:
+            responses = await asyncio.gather(
+                amv.am_i_ip(), amv.am_i_city(), amv.am_i_country(), amv.am_i_json()
+            )
+        return dict(zip(("ip", "city", "country", "json"), responses))
+
+    def app_api_fan_out(self) -> dict[str, str | dict]:
+        """
+        Check ip, city, country and json on am.i.mullvad.net concurrently,
+        multiplexed as HTTP/2 streams over a single connection.
+        Cannot be called from inside a running event loop.
+        :return: dict[str, str | dict] keyed by endpoint name
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._fan_out())
+        raise RuntimeError(
+            "app_api_fan_out cannot run inside an event loop; "
+            "use AsyncMullvadAPIEngine there instead"
+        )
+
+    def prefetch(self, *methods: str) -> dict[str, Future]:
+        """
+        Start argument-free endpoint methods in a thread pool sharing this
+        session, e.g. prefetch("app_api_relay_list", "am_i_json")
+        :param methods: str Names of MullvadAPIEngine methods to call
+        :return: dict[str, Future] keyed by method name
+        """
+        return {method: self._pool.submit(getattr(self, method)) for method in methods}
+
     def app_api_relay_list(self) -> RelayList:
         """
         List relays
+        The result is shared with later calls; do not modify it.
+        :return: RelayList
+        """
+        return self._get_cached(url=self._RELAYS_URL, model=RelayList)
+
+    def app_api_relay_list_unvalidated(self) -> RelayList:
+        """
+        List relays without validating them, using model_construct.
+        Only use when the response from api.mullvad.net is trusted.
         :return: RelayList
         """
-        ENDPOINT = "/v1/relays"
-        return RelayList(**self._get(url=self.APP_API_URL + ENDPOINT).json())
+        return _construct_relay_list(self._get_json(url=self._RELAYS_URL))
+
+    def app_api_relay_list_flat(self, section: str = "wireguard") -> RelayTable:
+        """
+        List the relays of one relay list section as numpy-backed columns
+        without building a model per relay. Requires numpy.
+        :param section: str One of "openvpn", "wireguard" or "bridge"
+        :return: RelayTable
+        """
+        if np is None:
+            raise ImportError("app_api_relay_list_flat requires numpy")
+        relays = self._get_json(url=self._RELAYS_URL)[section]["relays"]
+        return RelayTable.from_relays(relays)
 
-    def app_api_list_ip_addresses_for_reaching_the_api(self) -> requests.Response:
+    def app_api_iter_relays(self, section: str = "wireguard") -> Iterator[BaseModel]:
+        """
+        Stream the relays of one relay list section, parsing them one at a time
+        so the full response is never held in memory. Requires ijson.
+        :param section: str One of "openvpn", "wireguard" or "bridge"
+        :return: Iterator[OpenVPNRelay | WireGuardRelay | BridgeRelay]
+        """
+        if ijson is None:
+            raise ImportError("app_api_iter_relays requires ijson")
+        if section not in _RELAY_MODELS:
+            raise ValueError(
+                f"section must be one of {', '.join(_RELAY_MODELS)}, not {section!r}"
+            )
+        return self._iter_relays(section, _RELAY_MODELS[section])
+
+    def _iter_relays(self, section: str, model: type[ModelT]) -> Iterator[ModelT]:
+        with self._get(url=self._RELAYS_URL, stream=True) as response:
+            response.raw.decode_content = True
+            for relay in ijson.items(response.raw, f"{section}.relays.item"):
+                yield model.model_validate(relay)
+
+    def app_api_list_ip_addresses_for_reaching_the_api(self) -> list[str]:
         """
         List IP addresses for reaching the API
-        :return: requests.Response
+        :return: list[str]
         """
-        ENDPOINT = "/v1/api-addrs"
-        return self._get(url=self.APP_API_URL + ENDPOINT)
+        return self._get_json(url=self._API_ADDRS_URL)
 
     def app_api_submit_a_voucher(
         self, access_token: str, voucher_code: str
@@ -233,13 +646,12 @@ class MullvadAPIEngine:
         :param voucher_code: str voucher code
         :return: SubmitAVoucherResponse
         """
-        ENDPOINT = "/v1/submit-voucher"
-        return SubmitAVoucherResponse(
-            **self._post(
-                url=self.APP_API_URL + ENDPOINT,
+        return SubmitAVoucherResponse.model_validate_json(
+            self._post(
+                url=self._SUBMIT_VOUCHER_URL,
                 headers={f"Authorization": f"Bearer {access_token}"},
                 data={"voucher_code": voucher_code},
-            ).json()
+            ).content
         )
 
     def app_api_submit_a_problem_report(
@@ -249,12 +661,11 @@ class MullvadAPIEngine:
         Submit a problem report
         :return: SubmitAVoucherResponse
         """
-        ENDPOINT = "/v1/problem-report"
-        return SubmitAProblemReportResponse(
-            **self._post(
-                url=self.APP_API_URL + ENDPOINT,
+        return SubmitAProblemReportResponse.model_validate_json(
+            self._post(
+                url=self._PROBLEM_REPORT_URL,
                 data=submit_a_problem_report_parameters.model_dump(),
-            ).json()
+            ).content
         )
 
     def app_api_request_a_website_auth_token(self, access_token: str) -> AuthToken:
@@ -262,25 +673,35 @@ class MullvadAPIEngine:
         Request a website authorization token
         :return: AuthToken
         """
-        ENDPOINT = "/v1/www-auth-token"
-        return AuthToken(
-            **self._post(
-                url=self.APP_API_URL + ENDPOINT,
+        return AuthToken.model_validate_json(
+            self._post(
+                url=self._WWW_AUTH_TOKEN_URL,
                 headers={f"Authorization": f"Bearer {access_token}"},
-            ).json()
+            ).content
         )
 
     def app_api_information_about_app_release(
         self, platform: str, version: str
     ) -> InformationAboutAppReleaseResponse:
         """
-        Information about the application release
+        Information about the application release, cached per platform and
+        version for RELEASE_CACHE_TTL seconds, keeping the
+        RELEASE_CACHE_MAXSIZE most recently used entries
         :return: InformationAboutAppReleaseResponse
         """
-        ENDPOINT = f"/v1/releases/{platform}/{version}"
-        return InformationAboutAppReleaseResponse(
-            **self._get(url=self.APP_API_URL + ENDPOINT).json()
+        key = (platform, version)
+        cached = self._release_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.RELEASE_CACHE_TTL:
+            self._release_cache.move_to_end(key)
+            return cached[1]
+        release = InformationAboutAppReleaseResponse.model_validate_json(
+            self._get(url=f"{self._RELEASES_URL}/{platform}/{version}").content
         )
+        self._release_cache[key] = (time.monotonic(), release)
+        self._release_cache.move_to_end(key)
+        while len(self._release_cache) > self.RELEASE_CACHE_MAXSIZE:
+            self._release_cache.popitem(last=False)
+        return release
 
     def app_api_create_an_apple_in_app_payment(
         self, access_token: str, receipt_string: str
@@ -291,43 +712,80 @@ class MullvadAPIEngine:
         :param receipt_string: str An encrypted Base64-encoded App Store receipt
         :return: CreateAnAppleInAppPaymentResponse
         """
-        ENDPOINT = "/v1/create-apple-payment"
-        return CreateAnAppleInAppPaymentResponse(
-            **self._post(
-                url=self.APP_API_URL + ENDPOINT,
+        return CreateAnAppleInAppPaymentResponse.model_validate_json(
+            self._post(
+                url=self._CREATE_APPLE_PAYMENT_URL,
                 headers={f"Authorization": f"Bearer {access_token}"},
                 data={"receipt_string": receipt_string},
-            ).json()
+            ).content
         )
 
     def public_api_get_open_vpn_server_list(self) -> OpenVPNServerListResponse:
         """
         Returns a list of OpenVPN servers.
+        The result is shared with later calls; do not modify it.
+        :return: OpenVPNServerListResponse
+        """
+        return self._get_cached(
+            url=self._OPENVPN_RELAYS_URL, model=OpenVPNServerListResponse
+        )
+
+    def public_api_get_open_vpn_server_list_unvalidated(
+        self,
+    ) -> OpenVPNServerListResponse:
+        """
+        Returns a list of OpenVPN servers without validating them, using model_construct.
+        Only use when the response from api.mullvad.net is trusted.
         :return: OpenVPNServerListResponse
         """
-        ENDPOINT = "/relays/v1"
-        return OpenVPNServerListResponse(
-            **self._get(url=self.PUBLIC_API_URL + ENDPOINT).json()
+        return _construct_countries(
+            OpenVPNServerListResponse,
+            self._get_json(url=self._OPENVPN_RELAYS_URL),
         )
 
     def public_api_get_wireguard_server_list_v1(self) -> WireGuardServerListResponseV1:
         """
         Returns a list of WireGuard servers from the v1 endpoint.
+        The result is shared with later calls; do not modify it.
+        :return: WireGuardServerListResponseV1
+        """
+        return self._get_cached(
+            url=self._WIREGUARD_RELAYS_V1_URL, model=WireGuardServerListResponseV1
+        )
+
+    def public_api_get_wireguard_server_list_v1_unvalidated(
+        self,
+    ) -> WireGuardServerListResponseV1:
+        """
+        Returns a list of WireGuard servers from the v1 endpoint without validating them,
+        using model_construct. Only use when the response from api.mullvad.net is trusted.
         :return: WireGuardServerListResponseV1
         """
-        ENDPOINT = "/relays/wireguard/v1"
-        return WireGuardServerListResponseV1(
-            **self._get(url=self.PUBLIC_API_URL + ENDPOINT).json()
+        return _construct_countries(
+            WireGuardServerListResponseV1,
+            self._get_json(url=self._WIREGUARD_RELAYS_V1_URL),
         )
 
     def public_api_get_wireguard_server_list_v2(self) -> WireGuardServerListResponseV2:
         """
         Returns a list of WireGuard servers from the v2 endpoint.
+        The result is shared with later calls; do not modify it.
+        :return: WireGuardServerListResponseV2
+        """
+        return self._get_cached(
+            url=self._WIREGUARD_RELAYS_V2_URL, model=WireGuardServerListResponseV2
+        )
+
+    def public_api_get_wireguard_server_list_v2_unvalidated(
+        self,
+    ) -> WireGuardServerListResponseV2:
+        """
+        Returns a list of WireGuard servers from the v2 endpoint without validating them,
+        using model_construct. Only use when the response from api.mullvad.net is trusted.
         :return: WireGuardServerListResponseV2
         """
-        ENDPOINT = "/relays/wireguard/v2"
-        return WireGuardServerListResponseV2(
-            **self._get(url=self.PUBLIC_API_URL + ENDPOINT).json()
+        return _construct_wireguard_server_list_v2(
+            self._get_json(url=self._WIREGUARD_RELAYS_V2_URL)
         )
 
     def public_api_create_account(self) -> CreateAccountResponse:
@@ -335,9 +793,8 @@ class MullvadAPIEngine:
         Creates a new account.
         :return: CreateAccountResponse
         """
-        ENDPOINT = "/accounts/v1"
-        return CreateAccountResponse(
-            **self._post(url=self.PUBLIC_API_URL + ENDPOINT).json()
+        return CreateAccountResponse.model_validate_json(
+            self._post(url=self._ACCOUNTS_URL).content
         )
 
     def public_api_get_account_information(
@@ -348,9 +805,8 @@ class MullvadAPIEngine:
         :param token: str ID of the account
         :return: GetAccountInformationResponse
         """
-        ENDPOINT = f"/accounts/v1/{token}"
-        return GetAccountInformationResponse(
-            **self._get(url=self.PUBLIC_API_URL + ENDPOINT).json()
+        return GetAccountInformationResponse.model_validate_json(
+            self._get(url=f"{self._ACCOUNTS_URL}/{token}").content
         )
 
     def public_api_activate_voucher_code(
@@ -364,50 +820,262 @@ class MullvadAPIEngine:
         :param code: str The voucher code to redeem
         :return: ActivateVoucherCodeResponse
         """
-        ENDPOINT = "/vouchers/submit/v1"
         response = self._post(
-            url=self.PUBLIC_API_URL + ENDPOINT,
+            url=self._SUBMIT_VOUCHER_CODE_URL,
+            headers={"Content-type": "application/x-www-form-urlencoded"},
+            data=Voucher(account=account, code=code).model_dump(),
+        )
+        return ActivateVoucherCodeResponse(response=response.text)
+
+    def am_i_connected(self) -> bool:
+        """
+        Check if you are connected to Mullvad using am.i.mullvad.net/connected
+        :return: bool
+        """
+        text = self._get_text(url=self._AM_I_CONNECTED_URL)
+        return text.startswith("You are connected")
+
+    def am_i_ip(self) -> str:
+        """
+        Check your IP address using am.i.mullvad.net/ip
+        :return: str
+        """
+        return self._get_text(url=self._AM_I_IP_URL)
+
+    def am_i_city(self) -> str:
+        """
+        Check your IP geocoded city using am.i.mullvad.net/city
+        :return: str
+        """
+        return self._get_text(url=self._AM_I_CITY_URL)
+
+    def am_i_country(self) -> str:
+        """
+        Check your IP geocoded country using am.i.mullvad.net/country
+        :return: str
+        """
+        return self._get_text(url=self._AM_I_COUNTRY_URL)
+
+    def am_i_json(self) -> dict:
+        """
+        Return your full IP profile using am.i.mullvad.net/json
+        :return: dict
+        """
+        return self._get_json(url=self._AM_I_JSON_URL)
+
+
+class AsyncMullvadAPIEngine(_MullvadAPIURLs):
+    """
+    Async API calls to api.mullvad.net and am.i.mullvad.net over HTTP/2
+    https://api.mullvad.net/app/documentation
+    https://api.mullvad.net/public/documentation
+    """
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(http2=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        response = await self.client.get(url=url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        response = await self.client.post(url=url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def _get_json(self, url: str, **kwargs):
+        return orjson.loads((await self._get(url=url, **kwargs)).content)
+
+    async def _get_text(self, url: str, **kwargs) -> str:
+        return (await self._get(url=url, **kwargs)).text.strip()
+
+    async def app_api_relay_list(self) -> RelayList:
+        """
+        List relays
+        :return: RelayList
+        """
+        response = await self._get(url=self._RELAYS_URL)
+        return RelayList.model_validate_json(response.content)
+
+    async def app_api_list_ip_addresses_for_reaching_the_api(self) -> list[str]:
+        """
+        List IP addresses for reaching the API
+        :return: list[str]
+        """
+        return await self._get_json(url=self._API_ADDRS_URL)
+
+    async def app_api_submit_a_voucher(
+        self, access_token: str, voucher_code: str
+    ) -> SubmitAVoucherResponse:
+        """
+        Submit a voucher
+        :param access_token: str Bearer token
+        :param voucher_code: str voucher code
+        :return: SubmitAVoucherResponse
+        """
+        response = await self._post(
+            url=self._SUBMIT_VOUCHER_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+            data={"voucher_code": voucher_code},
+        )
+        return SubmitAVoucherResponse.model_validate_json(response.content)
+
+    async def app_api_submit_a_problem_report(
+        self, submit_a_problem_report_parameters: SubmitAProblemReportParameters
+    ) -> SubmitAProblemReportResponse:
+        """
+        Submit a problem report
+        :return: SubmitAProblemReportResponse
+        """
+        response = await self._post(
+            url=self._PROBLEM_REPORT_URL,
+            data=submit_a_problem_report_parameters.model_dump(),
+        )
+        return SubmitAProblemReportResponse.model_validate_json(response.content)
+
+    async def app_api_request_a_website_auth_token(
+        self, access_token: str
+    ) -> AuthToken:
+        """
+        Request a website authorization token
+        :return: AuthToken
+        """
+        response = await self._post(
+            url=self._WWW_AUTH_TOKEN_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        return AuthToken.model_validate_json(response.content)
+
+    async def app_api_information_about_app_release(
+        self, platform: str, version: str
+    ) -> InformationAboutAppReleaseResponse:
+        """
+        Information about the application release
+        :return: InformationAboutAppReleaseResponse
+        """
+        response = await self._get(url=f"{self._RELEASES_URL}/{platform}/{version}")
+        return InformationAboutAppReleaseResponse.model_validate_json(response.content)
+
+    async def app_api_create_an_apple_in_app_payment(
+        self, access_token: str, receipt_string: str
+    ) -> CreateAnAppleInAppPaymentResponse:
+        """
+        Create an Apple In-App payment
+        :param access_token: str Bearer token
+        :param receipt_string: str An encrypted Base64-encoded App Store receipt
+        :return: CreateAnAppleInAppPaymentResponse
+        """
+        response = await self._post(
+            url=self._CREATE_APPLE_PAYMENT_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+            data={"receipt_string": receipt_string},
+        )
+        return CreateAnAppleInAppPaymentResponse.model_validate_json(response.content)
+
+    async def public_api_get_open_vpn_server_list(self) -> OpenVPNServerListResponse:
+        """
+        Returns a list of OpenVPN servers.
+        :return: OpenVPNServerListResponse
+        """
+        response = await self._get(url=self._OPENVPN_RELAYS_URL)
+        return OpenVPNServerListResponse.model_validate_json(response.content)
+
+    async def public_api_get_wireguard_server_list_v1(
+        self,
+    ) -> WireGuardServerListResponseV1:
+        """
+        Returns a list of WireGuard servers from the v1 endpoint.
+        :return: WireGuardServerListResponseV1
+        """
+        response = await self._get(url=self._WIREGUARD_RELAYS_V1_URL)
+        return WireGuardServerListResponseV1.model_validate_json(response.content)
+
+    async def public_api_get_wireguard_server_list_v2(
+        self,
+    ) -> WireGuardServerListResponseV2:
+        """
+        Returns a list of WireGuard servers from the v2 endpoint.
+        :return: WireGuardServerListResponseV2
+        """
+        response = await self._get(url=self._WIREGUARD_RELAYS_V2_URL)
+        return WireGuardServerListResponseV2.model_validate_json(response.content)
+
+    async def public_api_create_account(self) -> CreateAccountResponse:
+        """
+        Creates a new account.
+        :return: CreateAccountResponse
+        """
+        response = await self._post(url=self._ACCOUNTS_URL)
+        return CreateAccountResponse.model_validate_json(response.content)
+
+    async def public_api_get_account_information(
+        self, token: str
+    ) -> GetAccountInformationResponse:
+        """
+        Returns information about an account.
+        :param token: str ID of the account
+        :return: GetAccountInformationResponse
+        """
+        response = await self._get(url=f"{self._ACCOUNTS_URL}/{token}")
+        return GetAccountInformationResponse.model_validate_json(response.content)
+
+    async def public_api_activate_voucher_code(
+        self,
+        account: str,
+        code: str,
+    ) -> ActivateVoucherCodeResponse:
+        """
+        Activate a voucher code on an account.
+        :param account: str The account to redeem the voucher to
+        :param code: str The voucher code to redeem
+        :return: ActivateVoucherCodeResponse
+        """
+        response = await self._post(
+            url=self._SUBMIT_VOUCHER_CODE_URL,
             headers={"Content-type": "application/x-www-form-urlencoded"},
             data=Voucher(account=account, code=code).model_dump(),
         )
         return ActivateVoucherCodeResponse(response=response.text)
 
-    def am_i_connected(self) -> requests.Response:
+    async def am_i_connected(self) -> bool:
         """
         Check if you are connected to Mullvad using am.i.mullvad.net/connected
-        :return: requests.Response
+        :return: bool
         """
-        ENDPOINT = "/connected"
-        return self._get(url=self.AM_I_URL + ENDPOINT)
+        text = await self._get_text(url=self._AM_I_CONNECTED_URL)
+        return text.startswith("You are connected")
 
-    def am_i_ip(self) -> requests.Response:
+    async def am_i_ip(self) -> str:
         """
         Check your IP address using am.i.mullvad.net/ip
-        :return: requests.Response
+        :return: str
         """
-        ENDPOINT = "/ip"
-        return self._get(url=self.AM_I_URL + ENDPOINT)
+        return await self._get_text(url=self._AM_I_IP_URL)
 
-    def am_i_city(self) -> requests.Response:
+    async def am_i_city(self) -> str:
         """
         Check your IP geocoded city using am.i.mullvad.net/city
-        :return: requests.Response
+        :return: str
         """
-        ENDPOINT = "/city"
-        return self._get(url=self.AM_I_URL + ENDPOINT)
+        return await self._get_text(url=self._AM_I_CITY_URL)
 
-    def am_i_country(self) -> requests.Response:
+    async def am_i_country(self) -> str:
         """
         Check your IP geocoded country using am.i.mullvad.net/country
-        :return: requests.Response
+        :return: str
         """
-        ENDPOINT = "/country"
-        return self._get(url=self.AM_I_URL + ENDPOINT)
+        return await self._get_text(url=self._AM_I_COUNTRY_URL)
 
-    def am_i_json(self) -> requests.Response:
+    async def am_i_json(self) -> dict:
         """
         Return your full IP profile using am.i.mullvad.net/json
-        :return: requests.Response
+        :return: dict
         """
-        ENDPOINT = "/json"
-        return self._get(url=self.AM_I_URL + ENDPOINT)
+        return await self._get_json(url=self._AM_I_JSON_URL)